@@ -91,6 +91,8 @@ class GeneralPurposeAgentApplication(ChatCompletion):
 app: DIALApp = DIALApp()
 agent_app = GeneralPurposeAgentApplication()
 app.add_chat_completion(deployment_name="general-purpose-agent", impl=agent_app)
+# Make sure background memory uploads land before the process exits
+app.add_event_handler("shutdown", agent_app.memory_store.flush_pending_uploads)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,50 @@
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True, boundscheck=False)
+def resolve_duplicates(
+        indices: np.ndarray,
+        distances: np.ndarray,
+        importance: np.ndarray,
+        order: np.ndarray,
+        threshold: float) -> np.ndarray:
+    """
+    Resolve which memories survive deduplication.
+
+    Walks memories in descending-importance `order`; each survivor removes its
+    not-yet-removed neighbors above the similarity `threshold`, and a memory
+    beaten by a more important neighbor is removed itself. Self-references and
+    padded neighbors (index < 0) are skipped.
+
+    Args:
+        indices: (n, k) neighbor indices per memory
+        distances: (n, k) cosine similarities per memory
+        importance: (n,) importance scores
+        order: (n,) memory indices sorted by descending importance
+        threshold: cosine similarity above which two memories are duplicates
+
+    Returns:
+        (n,) boolean keep-mask
+    """
+    n, k = indices.shape
+    removed = np.zeros(n, dtype=np.bool_)
+
+    for position in range(n):
+        i = order[position]
+        if removed[i]:
+            continue
+
+        for j in range(k):
+            neighbor = indices[i, j]
+            if neighbor < 0 or neighbor == i:
+                continue
+
+            if distances[i, j] > threshold and not removed[neighbor]:
+                if importance[i] >= importance[neighbor]:
+                    removed[neighbor] = True
+                else:
+                    removed[i] = True
+                    break
+
+    return ~removed
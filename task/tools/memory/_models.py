@@ -1,5 +1,8 @@
 from datetime import datetime, UTC
-from pydantic import BaseModel, Field
+
+import faiss
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class MemoryData(BaseModel):
@@ -17,9 +20,9 @@ class MemoryData(BaseModel):
 
 
 class Memory(BaseModel):
-    """Memory entry with embedding."""
+    """Memory entry; its embedding lives in the collection's binary sidecar."""
     data: MemoryData
-    embedding: list[float] = Field(description="Vector embedding")
+    embedding_index: int = Field(description="Row index into the embeddings sidecar matrix")
 
 
 class MemoryCollection(BaseModel):
@@ -27,6 +30,39 @@ class MemoryCollection(BaseModel):
     memories: list[Memory] = Field(default_factory=list)
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     last_deduplicated_at: datetime | None = None
+    # Shape of the binary sidecar rows; lets the loader detect a sidecar that
+    # disagrees with this file (e.g. a save that only half-landed)
+    embedding_dim: int | None = None
+
+    # Int8 scalar-quantized unit vectors, one row per memory in list order.
+    # Persisted as a raw binary sidecar file, not as JSON.
+    _emb_i8: np.ndarray | None = PrivateAttr(default=None)
+
+    # Cached search structures, built lazily from `_emb_i8` and kept in sync
+    # by LongTermMemoryStore. Never serialized.
+    _matrix: np.ndarray | None = PrivateAttr(default=None)
+    _index: "faiss.IndexFlatIP | None" = PrivateAttr(default=None)
+
+    # Incrementally maintained HNSW graph for dedup scans; rows are appended as
+    # memories arrive, so only removals force a rebuild. Never serialized.
+    _hnsw: "faiss.IndexHNSWFlat | None" = PrivateAttr(default=None)
+
+    # Recently served query results, keyed by query embedding (see
+    # LongTermMemoryStore._cached_search_result). Never serialized.
+    _query_index: "faiss.IndexFlatIP | None" = PrivateAttr(default=None)
+    _query_results: list[tuple[int, list[MemoryData]]] = PrivateAttr(default_factory=list)
+
+    def invalidate_search_cache(self) -> None:
+        """Drop the cached embeddings matrix and FAISS indexes (e.g. after deduplication)."""
+        self._matrix = None
+        self._index = None
+        self._hnsw = None
+        self.invalidate_query_cache()
+
+    def invalidate_query_cache(self) -> None:
+        """Drop cached query results; any write to `memories` can change them."""
+        self._query_index = None
+        self._query_results = []
 
     class Config:
         json_encoders = {
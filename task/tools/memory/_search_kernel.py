@@ -0,0 +1,48 @@
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True, fastmath=True, boundscheck=False)
+def topk_scores(matrix: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fused scoring + top-k selection for small collections.
+
+    Computes the inner product of every matrix row against the query in one
+    SIMD-friendly loop and keeps the running top-k in a small insertion-sorted
+    buffer (k <= 20 in practice), avoiding the full score array, argpartition
+    and argsort passes of the numpy path. Compiled and cached by numba; the
+    first call specializes the machine code for the concrete dtypes and dim.
+
+    Args:
+        matrix: (n, dim) float32 unit vectors
+        query: (dim,) float32 unit vector
+        k: number of results, must be <= n
+
+    Returns:
+        (k,) row indices sorted by descending score, and their scores
+    """
+    # With boundscheck off, k <= 0 would make the buffer accesses below write
+    # out of bounds and crash the process; bail out before touching them
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    n, dim = matrix.shape
+    top_indices = np.full(k, -1, dtype=np.int64)
+    top_scores = np.full(k, -np.inf, dtype=np.float32)
+
+    for i in range(n):
+        score = np.float32(0.0)
+        for j in range(dim):
+            score += matrix[i, j] * query[j]
+
+        if score > top_scores[k - 1]:
+            # Insert into the sorted buffer, shifting lower scores down
+            position = k - 1
+            while position > 0 and top_scores[position - 1] < score:
+                top_scores[position] = top_scores[position - 1]
+                top_indices[position] = top_indices[position - 1]
+                position -= 1
+            top_scores[position] = score
+            top_indices[position] = i
+
+    return top_indices, top_scores
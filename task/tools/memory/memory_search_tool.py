@@ -1,12 +1,23 @@
-import json
 from typing import Any
 
+from pydantic import BaseModel, ConfigDict, Field
+
 from task.tools.base import BaseTool
 from task.tools.memory._models import MemoryData
 from task.tools.memory.memory_store import LongTermMemoryStore
 from task.tools.models import ToolCallParams
 
 
+class _SearchArguments(BaseModel):
+    """Fixed-shape search_memory tool-call arguments, parsed without a generic json pass."""
+    model_config = ConfigDict(extra='ignore')
+
+    query: str
+    # Mirror the bounds advertised in the tool's JSON schema so out-of-range
+    # values surface as a ValidationError instead of flowing into the search
+    top_k: int = Field(default=5, ge=1, le=20)
+
+
 class SearchMemoryTool(BaseTool):
     """
     Tool for searching long-term memories about the user.
@@ -53,14 +64,14 @@ class SearchMemoryTool(BaseTool):
         }
 
     async def _execute(self, tool_call_params: ToolCallParams) -> str:
-        # 1. Load arguments with `json`
-        arguments = json.loads(tool_call_params.tool_call.function.arguments)
+        # 1. Parse arguments straight from the JSON string into the typed model
+        arguments = _SearchArguments.model_validate_json(tool_call_params.tool_call.function.arguments)
 
         # 2. Get `query` from arguments
-        query = arguments["query"]
+        query = arguments.query
 
         # 3. Get `top_k` from arguments, default is 5
-        top_k = arguments.get("top_k", 5)
+        top_k = arguments.top_k
 
         # 4. Call `memory_store` `search_memories`
         results: list[MemoryData] = await self.memory_store.search_memories(
@@ -1,45 +1,175 @@
 import os
 os.environ['OMP_NUM_THREADS'] = '1'
 
-import json
+import asyncio
+import functools
+import time
+import orjson
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, UTC, timedelta
 import numpy as np
 import faiss
-from aidial_client import AsyncDial
+import zstandard as zstd
+from aidial_client import AsyncDial, ResourceNotFoundError
 from sentence_transformers import SentenceTransformer
 
+from task.tools.memory._dedup_kernel import resolve_duplicates
 from task.tools.memory._models import Memory, MemoryData, MemoryCollection
+from task.tools.memory._search_kernel import topk_scores
+
+
+# Shared (de)compressor for the memories JSON; level 3 is the speed/ratio
+# sweet spot for small repetitive documents
+_ZSTD_COMPRESSOR = zstd.ZstdCompressor(level=3)
+_ZSTD_DECOMPRESSOR = zstd.ZstdDecompressor()
+
+
+def _is_not_found(error: BaseException) -> bool:
+    """True when DIAL affirmatively reports a file absent, as opposed to a transient failure."""
+    return isinstance(error, ResourceNotFoundError)
+
+
+@functools.cache
+def _get_model() -> SentenceTransformer:
+    """
+    Load the embedding model once per process, shared by all stores.
+
+    Prefers the ONNX Runtime backend, whose int8-capable CPU kernels run the
+    MiniLM forward pass several times faster than PyTorch FP32; falls back to
+    the default PyTorch backend when onnxruntime/optimum are not installed.
+    """
+    try:
+        return SentenceTransformer('all-MiniLM-L6-v2', backend='onnx')
+    except Exception as e:
+        print(f"Warning: ONNX backend unavailable ({e}), falling back to PyTorch")
+        return SentenceTransformer('all-MiniLM-L6-v2')
+
+
+@dataclass
+class _PendingEncode:
+    """A content string waiting for the next encode batch."""
+    text: str
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+@dataclass
+class _CacheEntry:
+    """A cached collection plus what is needed to revalidate it against DIAL."""
+    collection: MemoryCollection
+    etag: str | None
+    loaded_at: float
 
 
 class LongTermMemoryStore:
     """
     Manages long-term memory storage for users.
 
-    Storage format: Single JSON file per user in DIAL bucket
-    - File: {user_id}/long-memories.json
-    - Caching: In-memory cache with conversation_id as key
+    Storage format: Two files per user in DIAL bucket (SoA layout)
+    - Files: __long-memories/data.json (metadata) + embeddings.i8 (binary int8 matrix)
+    - Caching: In-memory TTL cache keyed by memory file path, revalidated by etag
     - Deduplication: O(n log n) using FAISS batch search
     """
 
     DEDUP_INTERVAL_HOURS = 24
+    # Within this window cached collections are served without talking to DIAL;
+    # after it they are revalidated by etag before being trusted again
+    CACHE_TTL_SECONDS = 60
+    # Below this count duplicates are too few to matter; skip the scan entirely
+    DEDUP_MIN_MEMORIES = 50
+    # Crossover where approximate HNSW search starts beating exact GEMM
+    DEDUP_BRUTE_FORCE_MAX_N = 2000
+    QUERY_CACHE_SIZE = 512
+    # Cosine similarity above which two queries are treated as the same search
+    QUERY_REUSE_THRESHOLD = 0.97
+    # How long the encode micro-batcher waits to coalesce concurrent requests
+    ENCODE_BATCH_WINDOW_SECONDS = 0.02
+    ENCODE_BATCH_SIZE = 32
+    # Below this size a single BLAS matrix-vector product beats FAISS call overhead
+    GEMM_SEARCH_MAX_N = 10_000
+    # Upper bound for the api-key -> file-paths memo; DIAL issues per-request
+    # keys, so without a cap it would grow for the life of the process
+    PATH_CACHE_SIZE = 1024
 
     def __init__(self, endpoint: str):
         # 1. Set endpoint
         self.endpoint = endpoint
-        # 2. Create SentenceTransformer as model, model name is `all-MiniLM-L6-v2`
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        # 3. Create cache, dict of str and MemoryCollection
-        self._cache: dict[str, MemoryCollection] = {}
+        # 2. The SentenceTransformer (`all-MiniLM-L6-v2`) is loaded lazily via
+        #    the `model` property so requests that never touch memory stay cheap
+        # 3. Create cache, dict of str and _CacheEntry
+        self._cache: dict[str, _CacheEntry] = {}
+        # Micro-batcher state for content encoding (created lazily, needs a running loop)
+        self._encode_queue: asyncio.Queue[_PendingEncode] | None = None
+        self._encode_task: asyncio.Task | None = None
+        # In-flight background uploads, one per memory file
+        self._pending_uploads: dict[str, asyncio.Task] = {}
+        # Bounded LRU of query text -> normalized (1, dim) embedding
+        self._query_vecs: OrderedDict[str, np.ndarray] = OrderedDict()
+        # Per-memory-file locks: concurrent tool calls serialize per user
+        # while different users proceed in parallel. Keyed by file path, not
+        # api key - DIAL issues per-request keys, and two requests from the
+        # same user must share one lock.
+        self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Bounded memo of (data, embeddings, legacy) file paths per api key;
+        # resolving them needs a my_appdata_home round trip, so pay it once
+        # per key (i.e. once per request) instead of once per tool call
+        self._paths: dict[str, tuple[str, str, str]] = {}
         # 4. Set FAISS threads to 1 for debug mode compatibility
         faiss.omp_set_num_threads(1)
 
+    @property
+    def model(self) -> SentenceTransformer:
+        return _get_model()
+
     async def _get_memory_file_path(self, dial_client: AsyncDial) -> str:
         """Get the path to the memory file in DIAL bucket."""
         # 1. Get DIAL app home path
         app_home = await dial_client.my_appdata_home()
-        # 2. Return string with path format: `files/{bucket_with_app_home}/__long-memories/data.json`
+        # 2. Return string with path format: `files/{bucket_with_app_home}/__long-memories/data.json.zst`
+        return f"files/{(app_home / '__long-memories' / 'data.json.zst').as_posix()}"
+
+    async def _get_legacy_memory_file_path(self, dial_client: AsyncDial) -> str:
+        """Get the pre-compression memory file path, read as a load fallback."""
+        app_home = await dial_client.my_appdata_home()
         return f"files/{(app_home / '__long-memories' / 'data.json').as_posix()}"
 
+    async def _get_embeddings_file_path(self, dial_client: AsyncDial) -> str:
+        """Get the path to the binary embeddings sidecar in DIAL bucket."""
+        app_home = await dial_client.my_appdata_home()
+        return f"files/{(app_home / '__long-memories' / 'embeddings.i8').as_posix()}"
+
+    async def _get_file_lock(self, api_key: str) -> asyncio.Lock:
+        """
+        Get the lock guarding this user's memory files.
+
+        Keyed by the memory file path: api keys are per request, so the path -
+        a stable function of the user identity - is the only key under which
+        two concurrent requests from the same user share a lock. Resolving it
+        is read-only and safe outside the lock.
+        """
+        memory_file_path, _, _ = await self._get_user_paths(api_key)
+        return self._locks[memory_file_path]
+
+    async def _get_user_paths(self, api_key: str) -> tuple[str, str, str]:
+        """Resolve (and memoize) the user's data, embeddings and legacy file paths."""
+        paths = self._paths.get(api_key)
+        if paths is None:
+            if len(self._paths) >= self.PATH_CACHE_SIZE:
+                # Cheap bounded eviction: reset instead of tracking per-entry age
+                self._paths.clear()
+            dial_client = AsyncDial(
+                base_url=self.endpoint,
+                api_key=api_key,
+                api_version='2025-01-01-preview'
+            )
+            paths = (
+                await self._get_memory_file_path(dial_client),
+                await self._get_embeddings_file_path(dial_client),
+                await self._get_legacy_memory_file_path(dial_client),
+            )
+            self._paths[api_key] = paths
+        return paths
+
     async def _load_memories(self, api_key: str) -> MemoryCollection:
         # 1. Create AsyncDial client (api_version is 2025-01-01-preview)
         dial_client = AsyncDial(
@@ -47,76 +177,401 @@ class LongTermMemoryStore:
             api_key=api_key,
             api_version='2025-01-01-preview'
         )
-        # 2. Get memory file path
-        memory_file_path = await self._get_memory_file_path(dial_client)
-
-        # 3. Check cache
-        if memory_file_path in self._cache:
-            return self._cache[memory_file_path]
+        # 2. Get memory file paths (memoized; no round trip after the first call)
+        memory_file_path, embeddings_file_path, legacy_file_path = await self._get_user_paths(api_key)
+
+        # 3. Check cache: serve fresh entries directly, revalidate stale ones
+        #    with a cheap etag check instead of a full redownload
+        entry = self._cache.get(memory_file_path)
+        if entry is not None:
+            # While our own upload is still in flight, the cache is the source
+            # of truth; revalidating against DIAL would read the old file
+            pending = self._pending_uploads.get(memory_file_path)
+            if pending is not None and not pending.done():
+                return entry.collection
+            if time.monotonic() - entry.loaded_at < self.CACHE_TTL_SECONDS:
+                return entry.collection
+            try:
+                metadata = await dial_client.files.get_metadata(memory_file_path)
+                current_etag = metadata.etag
+            except Exception as e:
+                if not _is_not_found(e):
+                    # DIAL is briefly unreachable: the entry we hold is intact,
+                    # so keep serving it and back off before retrying
+                    entry.loaded_at = time.monotonic()
+                    return entry.collection
+                # The file is affirmatively gone; reload below
+                current_etag = None
+            if current_etag is not None and current_etag == entry.etag:
+                entry.loaded_at = time.monotonic()
+                return entry.collection
+            # Another writer changed the file (or it is gone); reload below
+            del self._cache[memory_file_path]
 
-        # 4. Try to load from file, or create empty collection
-        try:
-            # Download file content
-            response = await dial_client.files.download(memory_file_path)
-            # Get content and decode with 'utf-8'
-            content = response.get_content().decode('utf-8')
-            # Load content with json
-            data = json.loads(content)
-            # Create MemoryCollection
-            collection = MemoryCollection.model_validate(data)
-        except Exception:
-            # Create empty MemoryCollection
+        # 4. Try to load from files (compressed first, then the pre-compression
+        #    layout), or create empty collection
+        etag: str | None = None
+        collection: MemoryCollection | None = None
+        for data_file_path, compressed in ((memory_file_path, True), (legacy_file_path, False)):
+            # Download metadata JSON and the embeddings sidecar in parallel.
+            # Only a DIAL-reported "not found" counts as a missing file: the
+            # sidecar may legitimately be absent (pre-series files keep
+            # embeddings inline in the JSON) and a missing data file means we
+            # try the next layout. Any other failure is transient and must
+            # propagate, or an intact store would be read as empty and then
+            # overwritten by the next save.
+            data_response, emb_response, metadata = await asyncio.gather(
+                dial_client.files.download(data_file_path),
+                dial_client.files.download(embeddings_file_path),
+                dial_client.files.get_metadata(data_file_path),
+                return_exceptions=True,
+            )
+            data_error = next(
+                (r for r in (data_response, metadata) if isinstance(r, BaseException)), None)
+            if data_error is not None:
+                if _is_not_found(data_error):
+                    continue
+                raise data_error
+            if isinstance(emb_response, BaseException):
+                if not _is_not_found(emb_response):
+                    raise emb_response
+                emb_bytes = None
+            else:
+                emb_bytes = emb_response.get_content()
+            data_bytes = data_response.get_content()
+            if compressed:
+                data_bytes = _ZSTD_DECOMPRESSOR.decompress(data_bytes)
+            collection = self._build_collection(data_bytes, emb_bytes)
+            etag = metadata.etag
+            break
+
+        if collection is None:
+            # Both layouts affirmatively absent: this user has no memories yet
             collection = MemoryCollection(
                 memories=[],
                 updated_at=datetime.now(UTC)
             )
 
+        # Recover a missing/inconsistent sidecar from the contents we do have
+        if collection.memories and collection._emb_i8 is None:
+            await self._reencode_embeddings(collection)
+
+        # Build search structures once per load instead of once per query
+        self._ensure_search_index(collection)
         # Put to cache
-        self._cache[memory_file_path] = collection
+        self._cache[memory_file_path] = _CacheEntry(
+            collection=collection,
+            etag=etag,
+            loaded_at=time.monotonic()
+        )
         # 5. Return created MemoryCollection
         return collection
 
+    @staticmethod
+    def _build_collection(data_bytes: bytes, emb_bytes: bytes | None) -> MemoryCollection:
+        """
+        Assemble a collection from the metadata JSON and sidecar bytes.
+
+        `emb_bytes` is None when no sidecar exists, which means the JSON is a
+        pre-series file with inline embeddings; it is migrated on the spot.
+        """
+        # Parse the raw bytes in one pass (orjson decodes UTF-8 internally)
+        data = orjson.loads(data_bytes)
+        if emb_bytes is None:
+            return LongTermMemoryStore._migrate_inline_collection(data)
+        try:
+            # The file came from our own save path, so skip per-field pydantic
+            # validation and construct the models directly; any schema drift
+            # drops us to the validating path below
+            collection = MemoryCollection.model_construct(
+                memories=[
+                    Memory.model_construct(
+                        data=MemoryData.model_construct(**m['data']),
+                        embedding_index=m['embedding_index'],
+                    )
+                    for m in data['memories']
+                ],
+                updated_at=datetime.fromisoformat(data['updated_at']),
+                last_deduplicated_at=(
+                    datetime.fromisoformat(data['last_deduplicated_at'])
+                    if data.get('last_deduplicated_at') else None
+                ),
+                embedding_dim=data.get('embedding_dim'),
+            )
+        except Exception:
+            collection = MemoryCollection.model_validate(data)
+        # One frombuffer replaces n per-memory float-list decodes (SoA layout)
+        if collection.memories:
+            emb_i8 = np.frombuffer(emb_bytes, dtype=np.int8)
+            n = len(collection.memories)
+            dim = collection.embedding_dim
+            if dim is not None and emb_i8.size == n * dim:
+                emb_i8 = emb_i8.reshape(n, dim)
+            elif dim is None and emb_i8.size > 0 and emb_i8.size % n == 0:
+                # File from before the dim was recorded: trust the row count
+                emb_i8 = emb_i8.reshape(n, -1)
+            else:
+                # Sidecar disagrees with the metadata file (e.g. a save that
+                # only half-landed); leave the matrix unset so the loader
+                # rebuilds it from the memory contents
+                print(f"Warning: embeddings sidecar inconsistent "
+                      f"({emb_i8.size} values for {n} memories, dim={dim}), re-encoding")
+                return collection
+            # Restore list-order alignment, then row i belongs to memories[i]
+            order = [m.embedding_index for m in collection.memories]
+            collection._emb_i8 = np.ascontiguousarray(emb_i8[order])
+            for row, memory in enumerate(collection.memories):
+                memory.embedding_index = row
+        return collection
+
+    @staticmethod
+    def _migrate_inline_collection(data: dict) -> MemoryCollection:
+        """
+        One-time migration of a pre-series memory file.
+
+        Old files stored each memory's embedding as an inline float list under
+        `embedding`. Decode those lists into the sidecar matrix (normalizing,
+        since the old format kept raw model output and the sidecar assumes unit
+        rows) so the next save writes the current two-file layout.
+        """
+        memories: list[Memory] = []
+        rows: list[np.ndarray] = []
+        for row, entry in enumerate(data.get('memories', [])):
+            memories.append(Memory(
+                data=MemoryData.model_validate(entry['data']),
+                embedding_index=row
+            ))
+            embedding = entry.get('embedding')
+            if embedding is not None:
+                rows.append(np.asarray(embedding, dtype=np.float32))
+        collection = MemoryCollection(
+            memories=memories,
+            updated_at=data['updated_at'],
+            last_deduplicated_at=data.get('last_deduplicated_at')
+        )
+        if rows and len(rows) == len(memories):
+            matrix = np.vstack(rows)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            collection._emb_i8 = LongTermMemoryStore._quantize_embedding(matrix)
+        # Otherwise leave the matrix unset; the loader re-encodes from content
+        return collection
+
+    async def _reencode_embeddings(self, collection: MemoryCollection) -> None:
+        """
+        Rebuild the sidecar matrix from memory contents.
+
+        Last-resort recovery for a sidecar that is missing or disagrees with
+        the metadata file: one batched forward pass restores the rows in list
+        order. The next save persists the rebuilt matrix.
+        """
+        contents = [memory.data.content for memory in collection.memories]
+        embeddings = await asyncio.to_thread(self._encode_batch, contents)
+        collection._emb_i8 = self._quantize_embedding(np.asarray(embeddings, dtype=np.float32))
+        for row, memory in enumerate(collection.memories):
+            memory.embedding_index = row
+
+    @staticmethod
+    def _quantize_embedding(vec: np.ndarray) -> np.ndarray:
+        """Scalar-quantize a unit vector to an int8 row for the sidecar matrix."""
+        return np.clip(np.round(vec * 127.0), -127, 127).astype(np.int8)
+
+    @staticmethod
+    def _dequantize(emb_i8: np.ndarray) -> np.ndarray:
+        """Expand int8 rows back into a contiguous float32 matrix."""
+        return np.ascontiguousarray(emb_i8, dtype=np.float32) / 127.0
+
+    def _ensure_search_index(self, collection: MemoryCollection) -> None:
+        """
+        Build the normalized embeddings matrix for a collection, plus a FAISS
+        index once the collection outgrows the brute-force GEMM path.
+
+        Both are cached on the collection and reused across queries; callers that
+        mutate `memories` must either update them incrementally or call
+        `collection.invalidate_search_cache()`.
+        """
+        if collection._matrix is not None or collection._emb_i8 is None:
+            return
+
+        # Dequantize once; rows are stored as unit vectors, so inner products
+        # are already cosine similarities
+        matrix = self._dequantize(collection._emb_i8)
+        collection._matrix = matrix
+
+        # Inner product over unit vectors = cosine similarity. Only worth the
+        # FAISS overhead for large collections; small ones search via matmul.
+        if len(collection.memories) >= self.GEMM_SEARCH_MAX_N:
+            index = faiss.IndexFlatIP(matrix.shape[1])
+            index.add(matrix)
+            collection._index = index
+
     async def _save_memories(self, api_key: str, memories: MemoryCollection):
-        """Save memories to DIAL bucket and update cache."""
+        """
+        Save memories to DIAL bucket and update cache.
+
+        The cache is updated synchronously; the network upload runs as a
+        background task so callers do not wait for the round trip. A newer
+        save for the same file supersedes (cancels) an in-flight upload.
+        Trade-off: an upload that fails after the tool already reported
+        success is only logged - the next save retries with the full state.
+        """
         # 1. Create AsyncDial client
         dial_client = AsyncDial(
             base_url=self.endpoint,
             api_key=api_key,
             api_version='2025-01-01-preview'
         )
-        # 2. Get memory file path
-        memory_file_path = await self._get_memory_file_path(dial_client)
+        # 2. Get memory file paths (memoized; no round trip after the first call)
+        memory_file_path, embeddings_file_path, _ = await self._get_user_paths(api_key)
         # 3. Update `updated_at` of memories (now)
         memories.updated_at = datetime.now(UTC)
-        # 4. Converts memories to json string (no indentation to minimize size)
-        json_data = memories.model_dump_json()
-        # Upload file
-        await dial_client.files.upload(url=memory_file_path, file=json_data.encode('utf-8'))
-        # 5. Put to cache
-        self._cache[memory_file_path] = memories
+        # 4. Converts memories to json bytes (no indentation to minimize size);
+        #    embeddings go to the binary sidecar, rows in list order
+        for row, memory in enumerate(memories.memories):
+            memory.embedding_index = row
+        memories.embedding_dim = (
+            int(memories._emb_i8.shape[1]) if memories._emb_i8 is not None and memories._emb_i8.size else None
+        )
+        json_data = _ZSTD_COMPRESSOR.compress(orjson.dumps(memories.model_dump(mode='json')))
+        emb_data = memories._emb_i8.tobytes() if memories._emb_i8 is not None else b''
+        # 5. Put to cache immediately; the etag is filled in when the upload lands
+        entry = _CacheEntry(
+            collection=memories,
+            etag=None,
+            loaded_at=time.monotonic()
+        )
+        self._cache[memory_file_path] = entry
+        # 6. Schedule the upload, superseding any in-flight one for this file
+        previous = self._pending_uploads.get(memory_file_path)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        self._pending_uploads[memory_file_path] = asyncio.create_task(
+            self._upload_memory_files(
+                dial_client, memory_file_path, json_data, embeddings_file_path, emb_data, entry)
+        )
+
+    async def _upload_memory_files(
+            self,
+            dial_client: AsyncDial,
+            memory_file_path: str,
+            json_data: bytes,
+            embeddings_file_path: str,
+            emb_data: bytes,
+            entry: _CacheEntry) -> None:
+        """
+        Upload the memory files and record the resulting etag.
+
+        The sidecar goes first: the metadata JSON is the source of truth, so it
+        is only replaced once the embeddings it describes have landed. If the
+        upload fails (or is cancelled) in between, the JSON/sidecar shape check
+        on load catches the disagreement and re-encodes.
+        """
+        try:
+            await dial_client.files.upload(url=embeddings_file_path, file=emb_data)
+            data_metadata = await dial_client.files.upload(url=memory_file_path, file=json_data)
+            entry.etag = getattr(data_metadata, 'etag', None)
+            entry.loaded_at = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Warning: Could not upload memories to {memory_file_path}: {e}")
+
+    async def flush_pending_uploads(self) -> None:
+        """Await all in-flight uploads; registered as an ASGI shutdown hook."""
+        tasks = [task for task in self._pending_uploads.values() if not task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     async def add_memory(self, api_key: str, content: str, importance: float, category: str, topics: list[str]) -> str:
         """Add a new memory to storage."""
-        # 1. Load memories
-        collection = await self._load_memories(api_key)
-        # 2. Make encodings for content with embedding model
-        embedding = self.model.encode([content])[0].tolist()
-        # 3. Create Memory
-        memory_data = MemoryData(
-            id=int(datetime.now(UTC).timestamp()),
-            content=content,
-            importance=importance,
-            category=category,
-            topics=topics
-        )
-        memory = Memory(data=memory_data, embedding=embedding)
-        # 4. Add to memories
-        collection.memories.append(memory)
-        # 5. Save memories
-        await self._save_memories(api_key, collection)
+        # 1. Make encodings for content with embedding model (batched, off the
+        #    event loop, normalized by the model) and quantize to int8 for
+        #    storage; the slow encode stays outside the lock
+        embedding_vec = await self._encode_content(content)
+        new_row = self._quantize_embedding(embedding_vec.reshape(1, -1))
+        # 2. Load and mutate the collection under the per-user lock
+        lock = await self._get_file_lock(api_key)
+        async with lock:
+            collection = await self._load_memories(api_key)
+            # 3. Create Memory
+            memory_data = MemoryData(
+                id=int(datetime.now(UTC).timestamp()),
+                content=content,
+                importance=importance,
+                category=category,
+                topics=topics
+            )
+            memory = Memory(data=memory_data, embedding_index=len(collection.memories))
+            # 4. Append to memories and the sidecar matrix, and update the cached
+            #    search structures incrementally
+            collection.memories.append(memory)
+            if collection._emb_i8 is None:
+                collection._emb_i8 = new_row
+            else:
+                collection._emb_i8 = np.vstack([collection._emb_i8, new_row])
+            if collection._matrix is not None:
+                # Add the quantized form so the matrix matches what a reload would build
+                new_vec = self._dequantize(new_row)
+                collection._matrix = np.vstack([collection._matrix, new_vec])
+                if collection._index is not None:
+                    collection._index.add(new_vec)
+                if collection._hnsw is not None:
+                    collection._hnsw.add(new_vec)
+            else:
+                self._ensure_search_index(collection)
+            collection.invalidate_query_cache()
+            # 5. Save memories
+            await self._save_memories(api_key, collection)
         # 6. Return success information
         return f"Memory successfully stored: '{content}'"
 
+    async def _encode_content(self, content: str) -> np.ndarray:
+        """
+        Encode content without blocking the event loop.
+
+        Requests are queued and flushed every ENCODE_BATCH_WINDOW_SECONDS so
+        concurrent add_memory calls share a single transformer forward pass.
+        """
+        if self._encode_queue is None:
+            self._encode_queue = asyncio.Queue()
+        pending = _PendingEncode(text=content)
+        self._encode_queue.put_nowait(pending)
+
+        if self._encode_task is None or self._encode_task.done():
+            self._encode_task = asyncio.create_task(self._drain_encode_queue())
+
+        return await pending.future
+
+    async def _drain_encode_queue(self) -> None:
+        """Flush the encode queue in batches until it is empty, then exit."""
+        while not self._encode_queue.empty():
+            # Let concurrent callers pile up before running the model
+            await asyncio.sleep(self.ENCODE_BATCH_WINDOW_SECONDS)
+
+            batch: list[_PendingEncode] = []
+            while not self._encode_queue.empty():
+                batch.append(self._encode_queue.get_nowait())
+            if not batch:
+                break
+
+            try:
+                embeddings = await asyncio.to_thread(self._encode_batch, [p.text for p in batch])
+                for pending, embedding in zip(batch, embeddings):
+                    if not pending.future.done():
+                        pending.future.set_result(embedding)
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        """Run one transformer forward pass for a batch of texts."""
+        return self.model.encode(
+            texts,
+            batch_size=self.ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
     async def search_memories(self, api_key: str, query: str, top_k: int = 5) -> list[MemoryData]:
         """
         Search memories using semantic similarity.
@@ -124,44 +579,118 @@ class LongTermMemoryStore:
         Returns:
             List of MemoryData objects (without embeddings)
         """
-        # 1. Load memories
-        collection = await self._load_memories(api_key)
-        # 2. If they are empty return empty array
-        if not collection.memories:
-            return []
-
-        # 3. Check if deduplication is needed
-        if self._needs_deduplication(collection):
-            collection = await self._deduplicate_and_save(api_key, collection)
-
-        # 4. Make vector search
-        query_embedding = self.model.encode([query])[0]
-
-        # Build embeddings matrix
-        embeddings = np.array([m.embedding for m in collection.memories], dtype=np.float32)
-
-        # Normalize for cosine similarity
-        faiss.normalize_L2(embeddings)
-        query_vec = np.array([query_embedding], dtype=np.float32)
-        faiss.normalize_L2(query_vec)
-
-        # Create FAISS index
-        dimension = embeddings.shape[1]
-        index = faiss.IndexFlatIP(dimension)  # Inner product = cosine similarity after normalization
-        index.add(embeddings)
+        # 1. Encode the query before taking the lock; it only depends on the text
+        query_vec = await self._encode_query(query)
+
+        lock = await self._get_file_lock(api_key)
+        async with lock:
+            # 2. Load memories; if they are empty return empty array
+            collection = await self._load_memories(api_key)
+            if not collection.memories:
+                return []
+
+            # 3. Check if deduplication is needed
+            if self._needs_deduplication(collection):
+                collection = await self._deduplicate_and_save(api_key, collection)
+
+            # 4. Make vector search against the cached index
+            self._ensure_search_index(collection)
+
+            k = min(top_k, len(collection.memories))
+
+            # Serve a near-duplicate query from the per-collection result cache
+            cached_results = self._cached_search_result(collection, query_vec, k)
+            if cached_results is not None:
+                return cached_results
+
+            # Search: one compiled score+select kernel for small collections,
+            # FAISS flat index beyond GEMM_SEARCH_MAX_N
+            if collection._index is not None:
+                distances, indices = collection._index.search(query_vec, k)
+                top_indices = indices[0]
+            else:
+                top_indices, _ = topk_scores(collection._matrix, query_vec[0], k)
+
+            # 5. Return top_k MemoryData based on vector search
+            results = [collection.memories[idx].data for idx in top_indices]
+            self._remember_search_result(collection, query_vec, k, results)
+            return results
+
+    async def _encode_query(self, query: str) -> np.ndarray:
+        """
+        Encode a search query into a normalized (1, dim) float32 vector.
 
-        # Search
-        k = min(top_k, len(collection.memories))
-        distances, indices = index.search(query_vec, k)
+        Hits come from a bounded LRU of recent queries; misses go through the
+        shared encode micro-batcher, so the transformer forward pass runs off
+        the event loop (the same path add_memory uses) instead of blocking it.
+        """
+        key = query.strip().lower()
+        cached = self._query_vecs.get(key)
+        if cached is not None:
+            self._query_vecs.move_to_end(key)
+            return cached
+        # The micro-batcher normalizes, so the vector matches the matrix rows
+        query_vec = (await self._encode_content(key)).reshape(1, -1)
+        self._query_vecs[key] = query_vec
+        if len(self._query_vecs) > self.QUERY_CACHE_SIZE:
+            self._query_vecs.popitem(last=False)
+        return query_vec
+
+    def _cached_search_result(
+            self, collection: MemoryCollection, query_vec: np.ndarray, k: int) -> list[MemoryData] | None:
+        """
+        Return a previously served result list if a near-identical query
+        (cosine >= QUERY_REUSE_THRESHOLD) was answered for the same collection
+        state. The cache is invalidated on every write to the collection.
+        """
+        if collection._query_index is None or collection._query_index.ntotal == 0:
+            return None
+
+        distances, indices = collection._query_index.search(query_vec, 1)
+        if distances[0][0] < self.QUERY_REUSE_THRESHOLD:
+            return None
+
+        cached_k, cached_results = collection._query_results[indices[0][0]]
+        return cached_results if cached_k == k else None
+
+    def _remember_search_result(
+            self, collection: MemoryCollection, query_vec: np.ndarray, k: int, results: list[MemoryData]) -> None:
+        """Remember a served result list for near-duplicate query reuse."""
+        if collection._query_index is None:
+            collection._query_index = faiss.IndexFlatIP(query_vec.shape[1])
+        elif collection._query_index.ntotal >= self.QUERY_CACHE_SIZE:
+            # Cheap bounded eviction: reset instead of tracking per-entry age
+            collection.invalidate_query_cache()
+            collection._query_index = faiss.IndexFlatIP(query_vec.shape[1])
+
+        collection._query_index.add(query_vec)
+        collection._query_results.append((k, results))
+
+    def _ensure_hnsw(self, collection: MemoryCollection, embeddings: np.ndarray) -> faiss.IndexHNSWFlat:
+        """
+        Build or top up the collection's incremental HNSW graph.
 
-        # 5. Return top_k MemoryData based on vector search
-        results = [collection.memories[idx].data for idx in indices[0]]
-        return results
+        HNSW supports appends but not removals, so add_memory extends it in
+        place while invalidate_search_cache drops it after rows are removed.
+        Any rows inserted while the graph was absent are added here.
+        """
+        if collection._hnsw is None:
+            dimension = embeddings.shape[1]
+            # Inner product over unit vectors = cosine similarity;
+            # 32 = M parameter (neighbors per layer)
+            index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 40  # Construction-time search depth
+            index.hnsw.efSearch = 64  # Query-time search depth; recall matters more than speed here
+            collection._hnsw = index
+
+        if collection._hnsw.ntotal < embeddings.shape[0]:
+            collection._hnsw.add(embeddings[collection._hnsw.ntotal:])
+        return collection._hnsw
 
     def _needs_deduplication(self, collection: MemoryCollection) -> bool:
         """Check if deduplication is needed (>24 hours since last deduplication)."""
-        # Criteria: (length > 10 and >24 hours since last dedup) or (length > 10 and never deduped)
-        if len(collection.memories) <= 10:
+        # Criteria: (length >= 50 and >24 hours since last dedup) or (length >= 50 and never deduped)
+        if len(collection.memories) < self.DEDUP_MIN_MEMORIES:
             return False
 
         if collection.last_deduplicated_at is None:
@@ -176,8 +705,8 @@ class LongTermMemoryStore:
         Returns the updated collection.
         """
         # 1. Make fast deduplication
-        deduplicated_memories = self._deduplicate_fast(collection.memories)
-        collection.memories = deduplicated_memories
+        self._deduplicate_fast(collection)
+        collection.invalidate_search_cache()
         # 2. Update last_deduplicated_at as now
         collection.last_deduplicated_at = datetime.now(UTC)
         # 3. Save deduplicated memories
@@ -185,65 +714,62 @@ class LongTermMemoryStore:
         # 4. Return deduplicated collection
         return collection
 
-    def _deduplicate_fast(self, memories: list[Memory]) -> list[Memory]:
+    def _deduplicate_fast(self, collection: MemoryCollection) -> None:
         """
-        Fast O(n log n) deduplication using FAISS HNSW index with cosine similarity.
+        Fast O(n log n) in-place deduplication using FAISS HNSW index with cosine similarity.
 
         Strategy:
         - Use HNSW (Hierarchical Navigable Small World) for O(log n) approximate nearest neighbor search
         - Find k nearest neighbors for each memory using cosine similarity
         - Mark duplicates based on similarity threshold (cosine similarity > 0.75)
         - Keep memory with higher importance
+
+        Drops duplicate rows from both `memories` and the sidecar matrix.
         """
+        memories = collection.memories
         if len(memories) <= 1:
-            return memories
+            return
 
         SIMILARITY_THRESHOLD = 0.75
 
-        # Build embeddings matrix
-        embeddings = np.array([m.embedding for m in memories], dtype=np.float32)
-
-        # Normalize for cosine similarity
-        faiss.normalize_L2(embeddings)
-
-        # Create HNSW index for O(n log n) complexity
-        dimension = embeddings.shape[1]
-        index = faiss.IndexHNSWFlat(dimension, 32)  # 32 = M parameter (neighbors per layer)
-        index.hnsw.efConstruction = 40  # Construction-time search depth
-        index.hnsw.efSearch = 16  # Query-time search depth
-        index.add(embeddings)
-
-        # Search for k nearest neighbors for each memory
-        # k=min(10, n) to find potential duplicates efficiently
-        k = min(10, len(memories))
-        distances, indices = index.search(embeddings, k)
-
-        # Track which memories to keep (not marked as duplicates)
-        to_remove = set()
-
-        # Sort memories by importance (descending) - higher importance survives
-        importance_order = sorted(range(len(memories)), key=lambda i: memories[i].data.importance, reverse=True)
-
-        for i in importance_order:
-            if i in to_remove:
-                continue
-
-            # Check neighbors of this memory
-            for j_idx in range(1, k):  # Skip index 0 (self)
-                neighbor_idx = indices[i][j_idx]
-                similarity = distances[i][j_idx]
-
-                # If similar enough and not already removed
-                if similarity > SIMILARITY_THRESHOLD and neighbor_idx not in to_remove:
-                    # Mark the neighbor as duplicate (current has higher or equal importance)
-                    if memories[i].data.importance >= memories[neighbor_idx].data.importance:
-                        to_remove.add(neighbor_idx)
-                    else:
-                        to_remove.add(i)
-                        break
+        # Dequantize embeddings matrix (rows are stored normalized)
+        embeddings = self._dequantize(collection._emb_i8)
+
+        n = len(memories)
+        k = min(10, n)
+        if n < self.DEDUP_BRUTE_FORCE_MAX_N:
+            # Exact: one GEMM for the full similarity matrix beats building an
+            # approximate index at this scale
+            similarity = embeddings @ embeddings.T
+            np.fill_diagonal(similarity, 0.0)
+            indices = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            distances = np.take_along_axis(similarity, indices, axis=1)
+        else:
+            # Query-only pass over the incrementally maintained HNSW graph;
+            # construction cost is amortized over inserts instead of paid here
+            index = self._ensure_hnsw(collection, embeddings)
+
+            # Search for k nearest neighbors for each memory
+            # k=min(10, n) to find potential duplicates efficiently
+            distances, indices = index.search(embeddings, k)
+
+        # Resolve survivors in a compiled kernel: higher importance wins,
+        # walking memories in descending-importance order
+        importance = np.array([m.data.importance for m in memories], dtype=np.float32)
+        order = np.argsort(-importance, kind='stable')
+        keep_mask = resolve_duplicates(
+            np.ascontiguousarray(indices, dtype=np.int64),
+            np.ascontiguousarray(distances, dtype=np.float32),
+            importance,
+            order,
+            SIMILARITY_THRESHOLD
+        )
 
-        # Return memories that weren't removed
-        return [m for idx, m in enumerate(memories) if idx not in to_remove]
+        # Drop removed memories and their sidecar rows together
+        collection.memories = [m for m, keep in zip(memories, keep_mask) if keep]
+        collection._emb_i8 = np.ascontiguousarray(collection._emb_i8[keep_mask])
+        for row, memory in enumerate(collection.memories):
+            memory.embedding_index = row
 
     async def delete_all_memories(self, api_key: str) -> str:
         """
@@ -258,15 +784,26 @@ class LongTermMemoryStore:
             api_key=api_key,
             api_version='2025-01-01-preview'
         )
-        # 2. Get memory file path
-        memory_file_path = await self._get_memory_file_path(dial_client)
-        # 3. Delete file
-        try:
-            await dial_client.files.delete(memory_file_path)
-        except Exception:
-            pass  # File might not exist
-        # Clear cache
-        if memory_file_path in self._cache:
-            del self._cache[memory_file_path]
-        # 4. Return info about successful memory deletion
+        # 2. Get memory file paths (memoized; no round trip after the first call)
+        memory_file_path, embeddings_file_path, legacy_file_path = await self._get_user_paths(api_key)
+        async with self._locks[memory_file_path]:
+            # 3. Stop any in-flight background upload first, otherwise it could
+            #    land after the deletes below and re-create the files
+            pending = self._pending_uploads.pop(memory_file_path, None)
+            if pending is not None and not pending.done():
+                pending.cancel()
+                try:
+                    await pending
+                except (asyncio.CancelledError, Exception):
+                    pass
+            # 4. Delete files
+            for path in (memory_file_path, embeddings_file_path, legacy_file_path):
+                try:
+                    await dial_client.files.delete(path)
+                except Exception:
+                    pass  # File might not exist
+            # Clear cache
+            if memory_file_path in self._cache:
+                del self._cache[memory_file_path]
+        # 5. Return info about successful memory deletion
         return "All memories have been successfully deleted."
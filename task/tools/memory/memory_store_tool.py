@@ -1,11 +1,22 @@
-import json
 from typing import Any
 
+from pydantic import BaseModel, ConfigDict, Field
+
 from task.tools.base import BaseTool
 from task.tools.memory.memory_store import LongTermMemoryStore
 from task.tools.models import ToolCallParams
 
 
+class _StoreArguments(BaseModel):
+    """Fixed-shape store_memory tool-call arguments, parsed without a generic json pass."""
+    model_config = ConfigDict(extra='ignore')
+
+    content: str
+    category: str = "general"
+    importance: float = 0.5
+    topics: list[str] = Field(default_factory=list)
+
+
 class StoreMemoryTool(BaseTool):
     """
     Tool for storing long-term memories about the user.
@@ -68,20 +79,20 @@ class StoreMemoryTool(BaseTool):
         }
 
     async def _execute(self, tool_call_params: ToolCallParams) -> str:
-        # 1. Load arguments with `json`
-        arguments = json.loads(tool_call_params.tool_call.function.arguments)
+        # 1. Parse arguments straight from the JSON string into the typed model
+        arguments = _StoreArguments.model_validate_json(tool_call_params.tool_call.function.arguments)
 
         # 2. Get `content` from arguments
-        content = arguments["content"]
+        content = arguments.content
 
         # 3. Get `category` from arguments
-        category = arguments["category"]
+        category = arguments.category
 
         # 4. Get `importance` from arguments, default is 0.5
-        importance = arguments.get("importance", 0.5)
+        importance = arguments.importance
 
         # 5. Get `topics` from arguments, default is empty array
-        topics = arguments.get("topics", [])
+        topics = arguments.topics
 
         # 6. Call `memory_store` `add_memory`
         result = await self.memory_store.add_memory(